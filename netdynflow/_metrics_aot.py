@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019, Gorka Zamora-López, Matthieu Gilson and Nikos E. Kouvaris
+# <galib@Zamora-Lopez.xyz>
+#
+# Released under the Apache License, Version 2.0 (the "License");
+# you may not use this software except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+"""
+Ahead-of-time compilation of the metric kernels
+===============================================
+
+Builds the extension module *_metrics_compiled* out of the Numba kernels in
+metrics.py, so that the compiled kernels are available without Numba being
+installed, and without paying for the JIT compilation at runtime. Numba is
+only needed to build the extension, which setup.py does at installation if
+Numba is importable, e.g., with 'pip install --no-build-isolation .' (Numba is
+not a build requirement in pyproject.toml). The extension can also be built by
+hand, from the root folder of the repository ::
+
+    $ python -m netdynflow._metrics_aot
+
+The AOT-compiled kernels run serially and are built without fastmath, so
+metrics.py uses its parallel Numba JIT kernels whenever Numba is installed, and
+the AOT-compiled ones only otherwise.
+
+...moduleauthor:: Gorka Zamora-Lopez <galib@zamora-lopez.xyz>
+
+"""
+from __future__ import division, print_function
+
+from numba.pycc import CC
+
+from netdynflow import metrics
+
+
+cc = CC('_metrics_compiled')
+
+# Compile the pure Python version of the kernels, for float64 and float32
+for _ftype in ['f8', 'f4']:
+    _tensor = '%s[:,:,::1]' %_ftype
+    cc.export('diversity_%s' %_ftype, 'f8[:](%s, b1)' %_tensor)(
+                                        metrics._diversity_kernel.py_func)
+    cc.export('nodeevolution_%s' %_ftype, 'UniTuple(f8[:,:], 2)(%s)' %_tensor)(
+                                        metrics._nodeevolution_kernel.py_func)
+    cc.export('allmetrics_%s' %_ftype,
+                'Tuple((f8[:], f8[:,:], f8[:,:], f8[:]))(%s, b1)' %_tensor)(
+                                        metrics._allmetrics_kernel.py_func)
+
+
+if __name__ == '__main__':
+    cc.compile()
@@ -18,6 +18,8 @@ matrices, represented as 2D NumPy arrays. Given a connectivity matrix, dynamic
 communicability and flow return a series of matrices arranged into a tensor
 (a numpy array of rank-3), each describing the state of the network at
 consecutive time points.
+The tensors are C-contiguous arrays of shape timesteps x N x N, the memory
+layout for which the functions in metrics.py are fastest.
 
 Generation of main tensors
 --------------------------
@@ -45,13 +47,12 @@ bioRxiv (2018). DOI: https://doi.org/10.1101/421883.
 from __future__ import division, print_function
 
 import numpy as np
-import numpy.linalg
 import scipy.linalg
 
 
 ## THE MAIN TENSORS ##########################################################
 def DynCom(conmatrix, tauconst, tmax=20, timestep=0.1, scalenorm=True,
-                                                            eigvalnorm=False):
+                                            eigvalnorm=False, dtype=np.float64):
     """Returns the temporal evolution of a network's dynamic communicability.
 
     Parameters
@@ -75,6 +76,9 @@ def DynCom(conmatrix, tauconst, tmax=20, timestep=0.1, scalenorm=True,
         'True' if adjacency matrix shall be normalised by the spectral diameter,
         'False' otherwise. This normalisation modifies the range of 'tauconst'
         for which the system converges.
+    dtype : data-type (optional)
+        Data type of the output tensor. With np.float32 the tensor takes half
+        the memory, and the functions in metrics.py read it twice as fast.
 
     Returns
     -------
@@ -92,10 +96,10 @@ def DynCom(conmatrix, tauconst, tmax=20, timestep=0.1, scalenorm=True,
     N = len(conmatrix)
     if eigvalnorm:
         # Find the spectral diameter
-        eigenvalues = numpy.linalg.eigvals(conmatrix)
-        evnorms = np.zeros(N, np.float)
+        eigenvalues = scipy.linalg.eigvals(conmatrix)
+        evnorms = np.zeros(N, np.float64)
         for i in range(N):
-            evnorms[i] = numpy.linalg.norm(eigenvalues[i])
+            evnorms[i] = abs(eigenvalues[i])
         evmax = evnorms.max()
 
         # Normalise the adjacency matrix
@@ -106,7 +110,7 @@ def DynCom(conmatrix, tauconst, tmax=20, timestep=0.1, scalenorm=True,
     if np.shape(tauconst):
         # In case tauconst was an array-like data
         assert len(tauconst) == N, "Data not aligned. 'conmatrix and tauconst not of same length"
-        if type(tauconst) == numpy.ndarray:
+        if type(tauconst) == np.ndarray:
             jac0diag = -1. / tauconst
         else:
             jac0diag = -1. / np.array(tauconst, dtype=float)
@@ -122,7 +126,7 @@ def DynCom(conmatrix, tauconst, tmax=20, timestep=0.1, scalenorm=True,
 
     # 2.2) Dynamic communicability over time
     nsteps = int(tmax / timestep) + 1
-    dyncomtensor = np.zeros((nsteps,N,N), np.float)
+    dyncomtensor = np.zeros((nsteps,N,N), dtype)
     for tidx in range(nsteps):
         t = tidx * timestep
         # Calculate the term for J0, without using expm(), which is very slow
@@ -138,7 +142,7 @@ def DynCom(conmatrix, tauconst, tmax=20, timestep=0.1, scalenorm=True,
 
     return dyncomtensor
 
-def DynFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True, eigvalnorm=False):
+def DynFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True, eigvalnorm=False, dtype=np.float64):
     """Returns the extrinsinc flow on a network over time for a given input.
 
     Parameters
@@ -164,6 +168,9 @@ def DynFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True
         'True' if adjacency matrix shall be normalised by the spectral diameter,
         'False' otherwise. This normalisation modifies the range of 'tauconst'
         for which the system converges.
+    dtype : data-type (optional)
+        Data type of the output tensor. With np.float32 the tensor takes half
+        the memory, and the functions in metrics.py read it twice as fast.
 
     Returns
     -------
@@ -182,10 +189,10 @@ def DynFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True
     N = len(conmatrix)
     if eigvalnorm:
         # Find the spectral diameter
-        eigenvalues = numpy.linalg.eigvals(conmatrix)
-        evnorms = np.zeros(N, np.float)
+        eigenvalues = scipy.linalg.eigvals(conmatrix)
+        evnorms = np.zeros(N, np.float64)
         for i in range(N):
-            evnorms[i] = numpy.linalg.norm(eigenvalues[i])
+            evnorms[i] = abs(eigenvalues[i])
         evmax = evnorms.max()
 
         # Normalise the adjacency matrix
@@ -196,7 +203,7 @@ def DynFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True
     if np.shape(tauconst):
         # In case tauconst was an array-like data
         assert len(tauconst) == N, "Data not aligned. 'conmatrix and tauconst not of same length"
-        if type(tauconst) == numpy.ndarray:
+        if type(tauconst) == np.ndarray:
             jac0diag = -1. / tauconst
         else:
             jac0diag = -1. / np.array(tauconst, dtype=float)
@@ -213,7 +220,7 @@ def DynFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True
     # 2.2) Calculate the extrinsic flow over time
     nsteps = int(tmax / timestep) + 1
     sigmamat = np.sqrt(sigmamat)
-    flowtensor = np.zeros((nsteps,N,N), np.float)
+    flowtensor = np.zeros((nsteps,N,N), dtype)
     for tidx in range(nsteps):
         t = tidx * timestep
         # Calculate the term for J0, without using expm(), which is very slow
@@ -231,7 +238,7 @@ def DynFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True
     return flowtensor
 
 def FullFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1,
-                                            scalenorm=True, eigvalnorm=False):
+                            scalenorm=True, eigvalnorm=False, dtype=np.float64):
     """Returns the complete flow on a network over time for a given input.
 
     Parameters
@@ -256,6 +263,9 @@ def FullFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1,
         'True' if adjacency matrix shall be normalised by the spectral diameter,
         'False' otherwise. This normalisation modifies the range of 'tauconst'
         for which the system converges.
+    dtype : data-type (optional)
+        Data type of the output tensor. With np.float32 the tensor takes half
+        the memory, and the functions in metrics.py read it twice as fast.
 
     Returns
     -------
@@ -274,10 +284,10 @@ def FullFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1,
     N = len(conmatrix)
     if eigvalnorm:
         # Find the spectral diameter
-        eigenvalues = numpy.linalg.eigvals(conmatrix)
-        evnorms = np.zeros(N, np.float)
+        eigenvalues = scipy.linalg.eigvals(conmatrix)
+        evnorms = np.zeros(N, np.float64)
         for i in range(N):
-            evnorms[i] = numpy.linalg.norm(eigenvalues[i])
+            evnorms[i] = abs(eigenvalues[i])
         evmax = evnorms.max()
 
         # Normalise the adjacency matrix
@@ -288,7 +298,7 @@ def FullFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1,
     if np.shape(tauconst):
         # In case tauconst was an array-like data
         assert len(tauconst) == N, "Data not aligned. 'conmatrix and tauconst not of same length"
-        if type(tauconst) == numpy.ndarray:
+        if type(tauconst) == np.ndarray:
             jac0diag = -1. / tauconst
         else:
             jac0diag = -1. / np.array(tauconst, dtype=float)
@@ -305,7 +315,7 @@ def FullFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1,
     # 2.2) Calculate the flow over time
     nsteps = int(tmax / timestep) + 1
     sigmamat = np.sqrt(sigmamat)
-    flowtensor = np.zeros((nsteps,N,N), np.float)
+    flowtensor = np.zeros((nsteps,N,N), dtype)
     for tidx in range(nsteps):
         t = tidx * timestep
         # Calculate the non-normalised flow at time t.
@@ -317,7 +327,7 @@ def FullFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1,
 
     return flowtensor
 
-def IntrinsicFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True, eigvalnorm=False):
+def IntrinsicFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenorm=True, eigvalnorm=False, dtype=np.float64):
     """Returns the intrinsic flow on a network over time for a given input.
 
     Parameters
@@ -343,6 +353,9 @@ def IntrinsicFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenor
         'True' if adjacency matrix shall be normalised by the spectral diameter,
         'False' otherwise. This normalisation modifies the range of 'tauconst'
         for which the system converges.
+    dtype : data-type (optional)
+        Data type of the output tensor. With np.float32 the tensor takes half
+        the memory, and the functions in metrics.py read it twice as fast.
 
     Returns
     -------
@@ -361,10 +374,10 @@ def IntrinsicFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenor
     N = len(conmatrix)
     if eigvalnorm:
         # Find the spectral diameter
-        eigenvalues = numpy.linalg.eigvals(conmatrix)
-        evnorms = np.zeros(N, np.float)
+        eigenvalues = scipy.linalg.eigvals(conmatrix)
+        evnorms = np.zeros(N, np.float64)
         for i in range(N):
-            evnorms[i] = numpy.linalg.norm(eigenvalues[i])
+            evnorms[i] = abs(eigenvalues[i])
         evmax = evnorms.max()
 
         # Normalise the adjacency matrix
@@ -375,7 +388,7 @@ def IntrinsicFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenor
     if np.shape(tauconst):
         # In case tauconst was an array-like data
         assert len(tauconst) == N, "Data not aligned. 'conmatrix and tauconst not of same length"
-        if type(tauconst) == numpy.ndarray:
+        if type(tauconst) == np.ndarray:
             jac0diag = -1. / tauconst
         else:
             jac0diag = -1. / np.array(tauconst, dtype=float)
@@ -392,7 +405,7 @@ def IntrinsicFlow(conmatrix, tauconst, sigmamat, tmax=20, timestep=0.1, scalenor
     # 2.2) Calculate the extrinsic flow over time
     nsteps = int(tmax / timestep) + 1
     sigmamat = np.sqrt(sigmamat)
-    flowtensor = np.zeros((nsteps,N,N), np.float)
+    flowtensor = np.zeros((nsteps,N,N), dtype)
     for tidx in range(nsteps):
         t = tidx * timestep
         # Calculate the term for J0, without using expm(), which is very slow
@@ -23,10 +23,34 @@ NodeEvolution
     Temporal evolution of all nodes' input and output communicability or flow.
 Diversity
     Temporal diversity for a networks dynamic communicability or flow.
+AllMetrics
+    Total, node-wise and diversity evolution, in a single pass over the tensor.
+DiversityLowRank
+    Temporal diversity of a tensor given by a low-rank representation.
 TTPdistance
     Pair-wise node distance, measured as the time-to-peak of their interaction.
     TO BE WRITTEN AND ADDED !! INCLUDE THE TEMPORAL RESOLUTION !!
 
+Metrics for tensors that do not fit in memory
+---------------------------------------------
+TotalEvolutionIter
+    Total communicability or flow over time, reading the tensor by blocks.
+NodeEvolutionIter
+    Nodes' input and output communicability or flow, reading the tensor by blocks.
+DiversityIter
+    Temporal diversity, reading the tensor by blocks.
+AllMetricsIter
+    Total, node-wise and diversity evolution, reading the tensor by blocks.
+
+Optional dependencies
+---------------------
+The metrics run with NumPy alone. If Numba is installed, the metric kernels are
+JIT-compiled and run in parallel. Otherwise, ahead-of-time compiled versions of
+the kernels are used if they were built at installation (see _metrics_aot.py),
+which run serially but need no Numba at runtime. numexpr, if installed, speeds
+up the NumPy-based calculation of the diversity. Tensors given as CuPy arrays
+stay in the GPU and all the calculations are done there by CuPy.
+
 Reference and Citation
 ----------------------
 1. M. Gilson, N. Kouvaris, G. Deco & G.Zamora-Lopez "Framework based on communi-
@@ -41,13 +65,278 @@ bioRxiv (2018). DOI: https://doi.org/10.1101/421883.
 """
 from __future__ import division, print_function
 
+import math
+import multiprocessing
 import numpy as np
-import numpy.linalg
-import scipy.linalg
+try:
+    import numexpr
+    _HAS_NUMEXPR = True
+except ImportError:
+    _HAS_NUMEXPR = False
+try:
+    import numba
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+try:
+    import cupy
+    _HAS_CUPY = True
+except ImportError:
+    _HAS_CUPY = False
+try:
+    from . import _metrics_compiled
+    _HAS_AOT = True
+except ImportError:
+    _HAS_AOT = False
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    _HAS_FUTURES = True
+except ImportError:
+    # Python 2.7 without the 'futures' backport
+    _HAS_FUTURES = False
+
+__all__ = ['TotalEvolution', 'NodeEvolution', 'Diversity', 'AllMetrics',
+           'DiversityLowRank', 'TotalEvolutionIter', 'NodeEvolutionIter',
+           'DiversityIter', 'AllMetricsIter']
+
+
+## COMPILED KERNELS (ONLY IF NUMBA IS AVAILABLE) #############################
+if _HAS_NUMBA:
+    @numba.njit(cache=True)
+    def _std_over_mean(s, s2, inv):
+        """Standard deviation over mean, from the sum and sum of squares of n
+        values, with 'inv' = 1 / n. Returns NaN or inf if the mean is zero, as
+        NumPy does, instead of raising ZeroDivisionError.
+        """
+        m = s * inv
+        sd = math.sqrt(max(s2*inv - m*m, 0.0))
+        if m == 0.0:
+            return np.nan if sd == 0.0 else np.inf
+        return sd / m
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _diversity_kernel(x, symmetric):
+        """Diversity of a C-contiguous tensor, one time step per thread.
+
+        If 'symmetric' is True only the upper triangle of the matrices is read.
+        """
+        T, N, _ = x.shape
+        out = np.empty(T, np.float64)
+        # Reciprocal of the matrix size, to multiply instead of divide. Empty
+        # matrices (N = 0) have zero sums, and _std_over_mean() gives NaN
+        invsize = 1.0 / max(N*N, 1)
+        for t in numba.prange(T):
+            # Accumulate sum and sum of squares in a single sweep of the matrix
+            s = 0.0
+            s2 = 0.0
+            if symmetric:
+                # The diagonal once, the entries above it count twice
+                for i in range(N):
+                    v = np.float64(x[t,i,i])
+                    s += v
+                    s2 += v*v
+                so = 0.0
+                so2 = 0.0
+                for i in range(N):
+                    for j in range(i+1, N):
+                        v = np.float64(x[t,i,j])
+                        so += v
+                        so2 += v*v
+                s += 2.0 * so
+                s2 += 2.0 * so2
+            else:
+                for i in range(N):
+                    for j in range(N):
+                        v = np.float64(x[t,i,j])
+                        s += v
+                        s2 += v*v
+            out[t] = _std_over_mean(s, s2, invsize)
+        return out
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _nodeevolution_kernel(x):
+        """Column and row sums of a C-contiguous tensor, in a single sweep."""
+        T, N, _ = x.shape
+        colsums = np.zeros((T,N), np.float64)
+        rowsums = np.zeros((T,N), np.float64)
+        for t in numba.prange(T):
+            for i in range(N):
+                rowsum = 0.0
+                for j in range(N):
+                    v = np.float64(x[t,i,j])
+                    rowsum += v
+                    colsums[t,j] += v
+                rowsums[t,i] = rowsum
+        return colsums, rowsums
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _allmetrics_kernel(x, symmetric):
+        """Total, node-wise and diversity of a C-contiguous tensor at once.
+
+        If 'symmetric' is True only the upper triangle of the matrices is read.
+        """
+        T, N, _ = x.shape
+        total = np.empty(T, np.float64)
+        colsums = np.zeros((T,N), np.float64)
+        rowsums = np.zeros((T,N), np.float64)
+        diversity = np.empty(T, np.float64)
+        # Reciprocal of the matrix size, to multiply instead of divide. Empty
+        # matrices (N = 0) have zero sums, and _std_over_mean() gives NaN
+        invsize = 1.0 / max(N*N, 1)
+        for t in numba.prange(T):
+            # Stream the matrix once, feeding all the accumulators
+            s = 0.0
+            s2 = 0.0
+            if symmetric:
+                # Entry (i,j) above the diagonal also stands for entry (j,i),
+                # and the column sums equal the row sums
+                for i in range(N):
+                    v = np.float64(x[t,i,i])
+                    rowsums[t,i] += v
+                    s += v
+                    s2 += v*v
+                so = 0.0
+                so2 = 0.0
+                for i in range(N):
+                    for j in range(i+1, N):
+                        v = np.float64(x[t,i,j])
+                        rowsums[t,i] += v
+                        rowsums[t,j] += v
+                        so += v
+                        so2 += v*v
+                s += 2.0 * so
+                s2 += 2.0 * so2
+                colsums[t] = rowsums[t]
+            else:
+                for i in range(N):
+                    rowsum = 0.0
+                    for j in range(N):
+                        v = np.float64(x[t,i,j])
+                        rowsum += v
+                        colsums[t,j] += v
+                        s2 += v*v
+                    rowsums[t,i] = rowsum
+                    s += rowsum
+            total[t] = s
+            diversity[t] = _std_over_mean(s, s2, invsize)
+        return total, colsums, rowsums, diversity
+
+
+## HELPER FUNCTIONS ##########################################################
+# Minimum number of entries of the whole tensor for the NumPy-based diversity to
+# be calculated in parallel threads
+_THREADS_MINSIZE = 2**20
+# Approximate size (in bytes) of the blocks of time steps the *Iter() functions
+# load into memory, if not given by the user or by the chunks of a HDF5 dataset
+_BLOCK_BYTES = 2**26
+
+def _get_array_module(dyntensor):
+    """Returns the module (cupy or numpy) the tensor belongs to."""
+    if _HAS_CUPY:
+        return cupy.get_array_module(dyntensor)
+    return np
+
+def _get_kernel(name, dyntensor, xp):
+    """Returns the compiled kernel 'name' for the tensor, or None if there is none.
+
+    The Numba JIT kernels are preferred if Numba is installed, as they run in
+    parallel. Otherwise, the ahead-of-time compiled kernels in _metrics_compiled
+    (see _metrics_aot.py) are used, which run serially. These exist for float64
+    and float32 tensors in native byte order, as their signatures are fixed and
+    the arguments are not checked.
+    """
+    if xp is not np:
+        return None
+    if _HAS_NUMBA:
+        return globals()['_%s_kernel' %name]
+    ftype = {np.float64: 'f8', np.float32: 'f4'}.get(dyntensor.dtype.type)
+    if _HAS_AOT and ftype and dyntensor.dtype.isnative:
+        return getattr(_metrics_compiled, '%s_%s' %(name, ftype))
+    return None
+
+def _diversity_numpy(flattensor, xp=np):
+    """Diversity of a tensor with every matrix flattened, of shape T x N**2.
+
+    'xp' is numpy, or cupy for tensors located in the GPU.
+    """
+    # The variance is computed in one pass as E[X^2] - E[X]^2
+    # Empty matrices (N = 0) have mean NaN, thus their diversity is NaN too
+    nvalues = flattensor.shape[1]
+    invsize = 1.0 / max(nvalues, 1)
+    meanvals = flattensor.mean(axis=1, dtype=np.float64)
+    sqmeanvals = xp.einsum('tk,tk->t', flattensor, flattensor,
+                            dtype=np.float64, optimize=True) * invsize
+    # numexpr (if available) evaluates the whole std / mean expression in
+    # one go, without intermediate arrays
+    if _HAS_NUMEXPR and xp is np:
+        diversity = numexpr.evaluate(
+            'sqrt(where(sqmeanvals > meanvals**2, sqmeanvals - meanvals**2, 0)) / meanvals')
+    else:
+        varvals = xp.maximum(sqmeanvals - meanvals*meanvals, 0)
+        diversity = xp.sqrt(varvals) / meanvals
+    return diversity
+
+def _diversity_threaded(flattensor, nthreads):
+    """Runs _diversity_numpy() over blocks of time steps in parallel threads.
+
+    NumPy releases the GIL during the reductions, so the threads do run
+    concurrently.
+    """
+    nsteps = len(flattensor)
+    bounds = np.linspace(0, nsteps, nthreads+1).astype(int)
+    with ThreadPoolExecutor(nthreads) as executor:
+        blocks = executor.map(
+                    lambda i: _diversity_numpy(flattensor[bounds[i]:bounds[i+1]]),
+                    range(nthreads) )
+        diversity = np.concatenate(list(blocks))
+    return diversity
+
+def _iterblocks(frames, blocksize=None):
+    """Yields consecutive blocks of time steps, as ndarrays of rank-3.
+
+    'frames' is either an array-like object of rank-3 that supports slicing
+    (an ndarray, a np.memmap or a h5py dataset), or any iterable returning
+    the matrices (ndarrays of rank-2) one time step at a time. An array-like
+    object with no time steps gives a single empty block, so that the metrics
+    return empty arrays of the right shape. An empty iterable raises
+    ValueError, since the number of nodes is then unknown.
+    """
+    if hasattr(frames, 'shape') and len(frames.shape) == 3:
+        # Slice the array-like object. Only each block is loaded from disk.
+        nsteps, N1, N2 = frames.shape
+        if blocksize is None:
+            chunks = getattr(frames, 'chunks', None)
+            if chunks:
+                # h5py dataset: read whole HDF5 chunks along time
+                blocksize = chunks[0]
+            else:
+                itemsize = np.dtype(frames.dtype).itemsize
+                blocksize = max(1, _BLOCK_BYTES // max(1, N1*N2*itemsize))
+        if nsteps == 0:
+            yield np.asarray(frames[0:0])
+        for t0 in range(0, nsteps, blocksize):
+            yield np.asarray(frames[t0:t0+blocksize])
+    else:
+        # Group the matrices coming from the iterable
+        block = []
+        nsteps = 0
+        for frame in frames:
+            frame = np.asarray(frame)
+            if blocksize is None:
+                blocksize = max(1, _BLOCK_BYTES // max(1, frame.nbytes))
+            block.append(frame)
+            nsteps += 1
+            if len(block) == blocksize:
+                yield np.array(block)
+                block = []
+        if block:
+            yield np.array(block)
+        if nsteps == 0:
+            raise ValueError('Input empty. At least one time step expected')
 
 
 ## METRICS EXTRACTED FROM THE FLOW AND COMMUNICABILITY TENSORS ################
-def TotalEvolution(dyntensor):
+def TotalEvolution(dyntensor, dtype=None):
     """Calculates total communicability or flow over time for a network.
 
     Parameters
@@ -55,6 +344,9 @@ def TotalEvolution(dyntensor):
     dyntensor : ndarray of rank-3
         Temporal evolution of the network's dynamic communicability. A tensor
         of shape timesteps x N x N, where N is the number of nodes.
+    dtype : data-type (optional)
+        If given, the tensor is converted to this type, e.g., np.float32
+        to halve the memory read. Sums are always accumulated in float64.
 
     Returns
     -------
@@ -62,16 +354,22 @@ def TotalEvolution(dyntensor):
         Array containing temporal evolution of the total communicability.
     """
     # 0) SECURITY CHECKS
-    tensorshape = np.shape(dyntensor)
-    assert len(tensorshape) == 3, 'Input not aligned. Tensor of rank-3 expected'
-    nsteps, N1, N2 = tensorshape
-    assert N1 == N2, 'Input not aligned. Shape (nsteps x N x N) expected'
+    if dyntensor.ndim != 3: raise ValueError('Input not aligned. Tensor of rank-3 expected')
+    nsteps, N1, N2 = dyntensor.shape
+    if N1 != N2: raise ValueError('Input not aligned. Shape (nsteps x N x N) expected')
+    # Make sure the tensor is C-contiguous, for which the reductions over the
+    # last axes are fastest, and in the native byte order the kernels expect
+    xp = _get_array_module(dyntensor)
+    dtype = np.dtype(dyntensor.dtype if dtype is None else dtype)
+    dyntensor = xp.ascontiguousarray(dyntensor, dtype=dtype.newbyteorder('='))
 
-    totaldyncom = dyntensor.sum(axis=1).sum(axis=1)
+    # Reduce each matrix in a single pass, leaving einsum() to choose the
+    # traversal of the tensor
+    totaldyncom = xp.einsum('tij->t', dyntensor, dtype=np.float64, optimize=True)
 
     return totaldyncom
 
-def NodeEvolution(dyntensor, directed=False):
+def NodeEvolution(dyntensor, directed=False, dtype=None):
     """Temporal evolution of all nodes' input and output communicability or flow.
 
     Parameters
@@ -79,6 +377,9 @@ def NodeEvolution(dyntensor, directed=False):
     dyntensor : ndarray of rank-3
         Temporal evolution of the network's dynamic communicability. A tensor
         of shape timesteps x N x N, where N is the number of nodes.
+    dtype : data-type (optional)
+        If given, the tensor is converted to this type, e.g., np.float32
+        to halve the memory read. Sums are always accumulated in float64.
 
     Returns
     -------
@@ -89,19 +390,29 @@ def NodeEvolution(dyntensor, directed=False):
         outputs.
     """
     # 0) SECURITY CHECKS
-    tensorshape = np.shape(dyntensor)
-    assert len(tensorshape) == 3, 'Input not aligned. Tensor of rank-3 expected'
-    nsteps, N1, N2 = tensorshape
-    assert N1 == N2, 'Input not aligned. Shape (nsteps x N x N) expected'
-
-    # 1) Calculate the input and output node properties
-    innodedyn = dyntensor.sum(axis=1).T
-    outnodedyn = dyntensor.sum(axis=2).T
+    if dyntensor.ndim != 3: raise ValueError('Input not aligned. Tensor of rank-3 expected')
+    nsteps, N1, N2 = dyntensor.shape
+    if N1 != N2: raise ValueError('Input not aligned. Shape (nsteps x N x N) expected')
+    # Make sure the tensor is C-contiguous, for which the reductions over the
+    # last axes are fastest, and in the native byte order the kernels expect
+    xp = _get_array_module(dyntensor)
+    dtype = np.dtype(dyntensor.dtype if dtype is None else dtype)
+    dyntensor = xp.ascontiguousarray(dyntensor, dtype=dtype.newbyteorder('='))
+
+    # 1) Calculate the input and output node properties. The compiled kernel
+    # obtains both in one sweep over the tensor.
+    kernel = _get_kernel('nodeevolution', dyntensor, xp)
+    if kernel is not None:
+        insums, outsums = kernel(dyntensor)
+        innodedyn, outnodedyn = insums.T, outsums.T
+    else:
+        innodedyn = xp.einsum('tij->jt', dyntensor, dtype=np.float64, optimize=True)
+        outnodedyn = xp.einsum('tij->it', dyntensor, dtype=np.float64, optimize=True)
     nodedyn = ( innodedyn, outnodedyn )
 
     return nodedyn
 
-def Diversity(dyntensor):
+def Diversity(dyntensor, symmetric=False, dtype=None, nthreads=None):
     """Temporal diversity for a networks dynamic communicability or flow.
 
     Parameters
@@ -109,6 +420,16 @@ def Diversity(dyntensor):
     dyntensor : ndarray of rank-3
         Temporal evolution of the network's dynamic communicability or flow. A
         tensor of shape timesteps x N x N, where N is the number of nodes.
+    symmetric : boolean (optional)
+        If True, the matrices are assumed symmetric (e.g., for undirected
+        networks) and only their upper triangle is read. Only a speed-up, the
+        result is wrong if the matrices are not symmetric.
+    dtype : data-type (optional)
+        If given, the tensor is converted to this type, e.g., np.float32
+        to halve the memory read. Sums are always accumulated in float64.
+    nthreads : integer (optional)
+        Number of threads for the NumPy-based calculation, used when the
+        compiled kernels are not available. If None, one per CPU core.
 
     Returns
     -------
@@ -116,17 +437,275 @@ def Diversity(dyntensor):
         Array containing temporal evolution of the diversity.
     """
     # 0) SECURITY CHECKS
-    tensorshape = np.shape(dyntensor)
-    assert len(tensorshape) == 3, 'Input not aligned. Tensor of rank-3 expected'
-    nsteps, N1, N2 = tensorshape
-    assert N1 == N2, 'Input not aligned. Shape (nsteps x N x N) expected'
+    if dyntensor.ndim != 3: raise ValueError('Input not aligned. Tensor of rank-3 expected')
+    nsteps, N1, N2 = dyntensor.shape
+    if N1 != N2: raise ValueError('Input not aligned. Shape (nsteps x N x N) expected')
+    # Make sure the tensor is C-contiguous, for which the reductions over the
+    # last axes are fastest, and in the native byte order the kernels expect
+    xp = _get_array_module(dyntensor)
+    dtype = np.dtype(dyntensor.dtype if dtype is None else dtype)
+    dyntensor = xp.ascontiguousarray(dyntensor, dtype=dtype.newbyteorder('='))
 
-    diversity = np.zeros(nsteps, np.float)
-    for t in range(nsteps):
-        diversity[t] = dyntensor[t].std() / dyntensor[t].mean()
+    # 1) Use the compiled kernel if available, or NumPy otherwise.
+    # Tensors in the GPU are handled by CuPy.
+    kernel = _get_kernel('diversity', dyntensor, xp)
+    if nthreads is None:
+        nthreads = multiprocessing.cpu_count()
+    nthreads = min(nthreads, nsteps)
+    if kernel is not None:
+        diversity = kernel(dyntensor, symmetric)
+    elif xp is np and _HAS_FUTURES and nthreads > 1 and \
+                                            dyntensor.size >= _THREADS_MINSIZE:
+        diversity = _diversity_threaded(dyntensor.reshape(nsteps, N1*N2), nthreads)
+    else:
+        diversity = _diversity_numpy(dyntensor.reshape(nsteps, N1*N2), xp)
 
     return diversity
 
+def AllMetrics(dyntensor, symmetric=False, dtype=None):
+    """Total, node-wise and diversity evolution, in a single pass over the tensor.
+
+    Equivalent to calling TotalEvolution(), NodeEvolution() and Diversity()
+    on the same tensor, but reading the tensor only once when the compiled
+    kernels are available (see 'Optional dependencies' in the module help).
+
+    Parameters
+    ----------
+    dyntensor : ndarray of rank-3
+        Temporal evolution of the network's dynamic communicability or flow. A
+        tensor of shape timesteps x N x N, where N is the number of nodes.
+    symmetric : boolean (optional)
+        If True, the matrices are assumed symmetric (e.g., for undirected
+        networks) and only their upper triangle is read. Only a speed-up, the
+        result is wrong if the matrices are not symmetric.
+    dtype : data-type (optional)
+        If given, the tensor is converted to this type, e.g., np.float32
+        to halve the memory read. Sums are always accumulated in float64.
+
+    Returns
+    -------
+    metrics : tuple.
+        A tuple (totaldyncom, innodedyn, outnodedyn, diversity) with the
+        outputs of TotalEvolution(), NodeEvolution() and Diversity(). The
+        node-wise arrays are of shape (N x timesteps).
+    """
+    # 0) SECURITY CHECKS
+    if dyntensor.ndim != 3: raise ValueError('Input not aligned. Tensor of rank-3 expected')
+    nsteps, N1, N2 = dyntensor.shape
+    if N1 != N2: raise ValueError('Input not aligned. Shape (nsteps x N x N) expected')
+    # Make sure the tensor is C-contiguous, for which the reductions over the
+    # last axes are fastest, and in the native byte order the kernels expect
+    xp = _get_array_module(dyntensor)
+    dtype = np.dtype(dyntensor.dtype if dtype is None else dtype)
+    dyntensor = xp.ascontiguousarray(dyntensor, dtype=dtype.newbyteorder('='))
+
+    # 1) Calculate all the metrics, in one sweep if a compiled kernel exists
+    kernel = _get_kernel('allmetrics', dyntensor, xp)
+    if kernel is not None:
+        totaldyncom, insums, outsums, diversity = kernel(dyntensor, symmetric)
+        innodedyn, outnodedyn = insums.T, outsums.T
+    else:
+        totaldyncom = TotalEvolution(dyntensor)
+        innodedyn, outnodedyn = NodeEvolution(dyntensor)
+        diversity = Diversity(dyntensor, symmetric)
+    metrics = ( totaldyncom, innodedyn, outnodedyn, diversity )
+
+    return metrics
+
+def DiversityLowRank(vecs, psitensor, diagconst=1.0):
+    """Temporal diversity of a tensor given by a low-rank representation.
+
+    For tensors whose matrices at every time step are of the form
+    C(t) = c I + V Psi(t) V^T, with V of shape N x r and r << N, the mean and
+    the standard deviation of C(t) are calculated out of the r x r matrices,
+    without building the N x N matrices. The cost is thus O(T r^2) instead
+    of O(T N^2).
+
+    Parameters
+    ----------
+    vecs : ndarray of rank-2
+        The matrix V of shape N x r, e.g., the leading eigenvectors of the
+        connectivity matrix.
+    psitensor : ndarray of rank-3
+        The r x r core matrices Psi(t) at every time step. A tensor of shape
+        timesteps x r x r.
+    diagconst : real valued number (optional)
+        The constant c multiplying the identity matrix.
+
+    Returns
+    -------
+    diversity : ndarray of rank-1
+        Array containing temporal evolution of the diversity.
+    """
+    # 0) SECURITY CHECKS
+    if vecs.ndim != 2: raise ValueError("'vecs' not aligned. Array of rank-2 expected")
+    N, r = vecs.shape
+    if psitensor.ndim != 3 or psitensor.shape[1:] != (r, r):
+        raise ValueError("'psitensor' not aligned. Shape (nsteps x r x r) expected")
+
+    # 1) Precompute the projections needed, of size r and r x r
+    uvec = vecs.sum(axis=0)
+    gram = np.dot(vecs.T, vecs)
+
+    # 2) Sum and sum of squares of C(t) = c I + M(t), with M(t) = V Psi(t) V^T
+    # sum(C) = c N + u^T Psi u, with u = V^T 1
+    sumvals = diagconst * N + np.einsum('a,tab,b->t', uvec, psitensor, uvec)
+    # sum(C**2) = c**2 N + 2 c tr(M) + ||M||_F**2, with tr(M) = tr(Psi G) and
+    # ||M||_F**2 = tr(Psi^T G Psi G) = sum(G Psi * Psi G), G = V^T V
+    traces = np.einsum('tab,ba->t', psitensor, gram)
+    psigram = np.matmul(psitensor, gram)
+    grampsi = np.matmul(gram, psitensor)
+    frobnorms = np.einsum('tab,tab->t', grampsi, psigram)
+    sqsumvals = diagconst**2 * N + 2*diagconst * traces + frobnorms
+
+    # 3) The diversity
+    invsize = 1.0 / (N*N)
+    meanvals = sumvals * invsize
+    varvals = np.maximum(sqsumvals * invsize - meanvals*meanvals, 0)
+    diversity = np.sqrt(varvals) / meanvals
+
+    return diversity
+
+
+## METRICS FOR TENSORS THAT DO NOT FIT IN MEMORY #############################
+def TotalEvolutionIter(frames, dtype=None, blocksize=None):
+    """Total communicability or flow over time, reading the tensor by blocks.
+
+    Same as TotalEvolution() but holding only a block of time steps in memory
+    at once.
+
+    Parameters
+    ----------
+    frames : array-like of rank-3, or iterable of ndarrays of rank-2
+        Temporal evolution of the network's dynamic communicability or flow.
+        Either a tensor of shape timesteps x N x N that supports slicing (e.g.,
+        a np.memmap or a h5py dataset), or an iterable (e.g., a generator)
+        returning the N x N matrices one time step at a time.
+    dtype : data-type (optional)
+        If given, every block is converted to this type, e.g., np.float32.
+    blocksize : integer (optional)
+        Number of time steps loaded at once. If None, the chunk size along
+        time for h5py datasets, or blocks of around 64 MB otherwise.
+
+    Returns
+    -------
+    totaldyncom : ndarray of rank-1
+        Array containing temporal evolution of the total communicability.
+    """
+    totaldyncom = [ TotalEvolution(block, dtype)
+                        for block in _iterblocks(frames, blocksize) ]
+    totaldyncom = np.concatenate(totaldyncom)
+
+    return totaldyncom
+
+def NodeEvolutionIter(frames, dtype=None, blocksize=None):
+    """Nodes' input and output communicability or flow, reading the tensor by blocks.
+
+    Same as NodeEvolution() but holding only a block of time steps in memory
+    at once.
+
+    Parameters
+    ----------
+    frames : array-like of rank-3, or iterable of ndarrays of rank-2
+        Temporal evolution of the network's dynamic communicability or flow.
+        Either a tensor of shape timesteps x N x N that supports slicing (e.g.,
+        a np.memmap or a h5py dataset), or an iterable (e.g., a generator)
+        returning the N x N matrices one time step at a time.
+    dtype : data-type (optional)
+        If given, every block is converted to this type, e.g., np.float32.
+    blocksize : integer (optional)
+        Number of time steps loaded at once. If None, the chunk size along
+        time for h5py datasets, or blocks of around 64 MB otherwise.
+
+    Returns
+    -------
+    nodedyncom : tuple.
+        Temporal evolution of the communicability or flow for all nodes.
+        The result consists of a tuple of two ndarrays of shape (N x timesteps)
+        each. The first is for the inputs to the node and the second for its
+        outputs.
+    """
+    innodedyn = []
+    outnodedyn = []
+    for block in _iterblocks(frames, blocksize):
+        blockin, blockout = NodeEvolution(block, dtype=dtype)
+        innodedyn.append(blockin)
+        outnodedyn.append(blockout)
+    nodedyn = ( np.concatenate(innodedyn, axis=1),
+                np.concatenate(outnodedyn, axis=1) )
+
+    return nodedyn
+
+def DiversityIter(frames, symmetric=False, dtype=None, blocksize=None):
+    """Temporal diversity, reading the tensor by blocks.
+
+    Same as Diversity() but holding only a block of time steps in memory
+    at once.
+
+    Parameters
+    ----------
+    frames : array-like of rank-3, or iterable of ndarrays of rank-2
+        Temporal evolution of the network's dynamic communicability or flow.
+        Either a tensor of shape timesteps x N x N that supports slicing (e.g.,
+        a np.memmap or a h5py dataset), or an iterable (e.g., a generator)
+        returning the N x N matrices one time step at a time.
+    symmetric : boolean (optional)
+        If True, the matrices are assumed symmetric. See Diversity().
+    dtype : data-type (optional)
+        If given, every block is converted to this type, e.g., np.float32.
+    blocksize : integer (optional)
+        Number of time steps loaded at once. If None, the chunk size along
+        time for h5py datasets, or blocks of around 64 MB otherwise.
+
+    Returns
+    -------
+    diversity : ndarray of rank-1
+        Array containing temporal evolution of the diversity.
+    """
+    diversity = [ Diversity(block, symmetric, dtype)
+                        for block in _iterblocks(frames, blocksize) ]
+    diversity = np.concatenate(diversity)
+
+    return diversity
+
+def AllMetricsIter(frames, symmetric=False, dtype=None, blocksize=None):
+    """Total, node-wise and diversity evolution, reading the tensor by blocks.
+
+    Same as AllMetrics() but holding only a block of time steps in memory
+    at once. All the metrics are obtained from a single read of the data.
+
+    Parameters
+    ----------
+    frames : array-like of rank-3, or iterable of ndarrays of rank-2
+        Temporal evolution of the network's dynamic communicability or flow.
+        Either a tensor of shape timesteps x N x N that supports slicing (e.g.,
+        a np.memmap or a h5py dataset), or an iterable (e.g., a generator)
+        returning the N x N matrices one time step at a time.
+    symmetric : boolean (optional)
+        If True, the matrices are assumed symmetric. See AllMetrics().
+    dtype : data-type (optional)
+        If given, every block is converted to this type, e.g., np.float32.
+    blocksize : integer (optional)
+        Number of time steps loaded at once. If None, the chunk size along
+        time for h5py datasets, or blocks of around 64 MB otherwise.
+
+    Returns
+    -------
+    metrics : tuple.
+        A tuple (totaldyncom, innodedyn, outnodedyn, diversity) with the
+        outputs of TotalEvolution(), NodeEvolution() and Diversity(). The
+        node-wise arrays are of shape (N x timesteps).
+    """
+    blockmetrics = [ AllMetrics(block, symmetric, dtype)
+                        for block in _iterblocks(frames, blocksize) ]
+    totaldyncom, innodedyn, outnodedyn, diversity = zip(*blockmetrics)
+    metrics = ( np.concatenate(totaldyncom),
+                np.concatenate(innodedyn, axis=1),
+                np.concatenate(outnodedyn, axis=1),
+                np.concatenate(diversity) )
+
+    return metrics
+
 
 
 ##
@@ -1,11 +1,28 @@
 '''setup.py'''
 
+import os
+import sys
 from setuptools import setup, find_packages
 
 
 with open("requirements.txt") as reqs_file:
     REQS = [line.rstrip() for line in reqs_file.readlines() if line[0] not in ['\n', '-', '#']]
 
+# Build the ahead-of-time compiled metric kernels, only if Numba is available.
+# The extension is optional: if it fails to build, e.g., for lack of a C
+# compiler, the package is installed without it. The extension lists the C
+# sources of Numba by absolute path, which setuptools rejects when looking for
+# package data (include_package_data below), and the package has none.
+# PEP 517 builds do not put the source folder in the path, so add it here.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+    from netdynflow._metrics_aot import cc
+    AOT_EXTENSION = cc.distutils_extension()
+    AOT_EXTENSION.optional = True
+    EXT_MODULES = [AOT_EXTENSION]
+except Exception:
+    EXT_MODULES = []
+
 setup(
     name =  'netdynflow',
     description = 'A package to study complex networks based on their temporal Dynamic Communicability and Flow.',
@@ -18,8 +35,9 @@ setup(
 
     install_requires =  REQS,
     packages =  find_packages(exclude=['doc', '*tests*']),
+    ext_modules =  EXT_MODULES,
     scripts =  [],
-    include_package_data =  True,
+    include_package_data =  False,
 
     keywords =  'graph theory, complex networks, network analysis, weighted networks',
     classifiers =  [